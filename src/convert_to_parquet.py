@@ -0,0 +1,16 @@
+import pandas as pd
+
+# One-time conversion of the segmented RFM data to Parquet for faster dashboard loads.
+# Run from the project root after the notebook has written rfm_segmented.csv:
+#   python src/convert_to_parquet.py
+
+rfm = pd.read_csv('data/processed/rfm_segmented.csv',
+                  usecols=['CustomerID', 'Recency', 'Frequency', 'Monetary', 'Cluster'],
+                  dtype={'CustomerID': 'int32', 'Recency': 'int32', 'Frequency': 'int32',
+                         'Monetary': 'float32', 'Cluster': 'int8'},
+                  engine='pyarrow')
+
+rfm.to_parquet('data/processed/rfm_segmented.parquet', engine='pyarrow',
+               compression='snappy', index=False)
+
+print(f"Wrote {len(rfm):,} customers to data/processed/rfm_segmented.parquet")
@@ -1,3 +1,5 @@
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -6,6 +8,8 @@ import plotly.graph_objects as go
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 
+from segments import segment_names, colors_map, segment_strategies
+
 # Page config
 st.set_page_config(
     page_title="Customer Segmentation Analysis",
@@ -19,17 +23,239 @@ st.markdown("""
 Analyzed **800k+ transactions** from 5,878 customers to identify distinct segments using RFM (Recency, Frequency, Monetary) analysis and K-means clustering.
 """)
 
-# Load data
-@st.cache_data
+# Load data (cached by reference: callers must treat rfm and agg as read-only)
+@st.cache_resource
 def load_data():
-    rfm = pd.read_csv('data/processed/rfm_segmented.csv')
-    return rfm
+    # Written by src/convert_to_parquet.py with downcast dtypes already applied;
+    # fall back to the notebook's CSV output if the conversion hasn't been run
+    # or the notebook has rewritten the CSV since
+    parquet_path = 'data/processed/rfm_segmented.parquet'
+    csv_path = 'data/processed/rfm_segmented.csv'
+    if os.path.exists(parquet_path) and (
+            not os.path.exists(csv_path)
+            or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)):
+        rfm = pd.read_parquet(parquet_path, engine='pyarrow')
+    else:
+        rfm = pd.read_csv(csv_path,
+                          usecols=['CustomerID', 'Recency', 'Frequency', 'Monetary', 'Cluster'],
+                          dtype={'CustomerID': 'int32', 'Recency': 'int32', 'Frequency': 'int32',
+                                 'Monetary': 'float32', 'Cluster': 'int8'},
+                          engine='pyarrow')
+    # Categories ordered by cluster id so each code maps to its own segment name
+    rfm['SegmentName'] = pd.Categorical.from_codes(rfm['Cluster'],
+                                                   categories=[segment_names[i] for i in sorted(segment_names)])
+    rfm['LogMonetary'] = np.log1p(rfm['Monetary'].to_numpy(dtype=np.float32))
+    
+    # Segment-level aggregates, computed once instead of on every rerun
+    # (summed in float64 so revenue totals keep cent-level precision)
+    agg = rfm.assign(Monetary=rfm['Monetary'].astype('float64')).groupby('Cluster').agg({
+        'Recency': 'mean',
+        'Frequency': 'mean',
+        'Monetary': ['mean', 'sum', 'count']
+    })
+    agg.columns = ['recency_mean', 'frequency_mean', 'monetary_mean', 'monetary_sum', 'count']
+    agg = agg[['count', 'recency_mean', 'frequency_mean', 'monetary_mean', 'monetary_sum']]
+    agg.index = agg.index.map(segment_names).rename('SegmentName')
+    agg = agg.sort_index()
+    return rfm, agg
+
+@st.cache_data
+def get_filtered(segments):
+    rfm, _ = load_data()
+    return rfm[rfm['SegmentName'].isin(segments)].copy()
+
+# All segments selected is the default, so hand back the full frame (no mask, no copy)
+def filtered(segments):
+    if len(segments) == len(segment_names):
+        return load_data()[0]
+    return get_filtered(segments)
+
+@st.cache_data
+def get_segment(name):
+    rfm, _ = load_data()
+    return rfm[rfm['SegmentName'] == name]
+
+# Top-k customers by spend via a linear-time partition instead of a full sort
+@st.cache_data
+def get_top_customers(name, k=10):
+    seg = get_segment(name)
+    arr = seg['Monetary'].to_numpy()
+    k = min(k, len(arr))
+    if k == 0:
+        return seg.iloc[:0][['CustomerID', 'Recency', 'Frequency', 'Monetary']]
+    idx = np.argpartition(-arr, k - 1)[:k]
+    idx = idx[np.argsort(-arr[idx])]
+    return seg.iloc[idx][['CustomerID', 'Recency', 'Frequency', 'Monetary']]
+
+# Cap points per segment sent to the browser for scatter plots
+@st.cache_data
+def downsample(name, n=1000):
+    seg = get_segment(name)
+    return seg.sample(min(n, len(seg)), random_state=0)
+
+# Segment comparison table, pre-formatted as display strings (3 rows, shown with st.table)
+@st.cache_data
+def build_comparison_table():
+    _, agg = load_data()
+    comparison = agg.round(2)
+    
+    comparison.columns = ['Customer Count', 'Avg Recency (days)', 'Avg Frequency', 'Avg Monetary ($)', 'Total Revenue ($)']
+    comparison['Revenue %'] = (comparison['Total Revenue ($)'] / comparison['Total Revenue ($)'].sum() * 100).round(1)
+    
+    formats = {
+        'Customer Count': '{:,.0f}',
+        'Avg Recency (days)': '{:.0f}',
+        'Avg Frequency': '{:.1f}',
+        'Avg Monetary ($)': '${:,.0f}',
+        'Total Revenue ($)': '${:,.0f}',
+        'Revenue %': '{:.1f}%'
+    }
+    for column, fmt in formats.items():
+        comparison[column] = comparison[column].map(fmt.format)
+    return comparison
+
+# Figure builders, cached per segment selection so reruns reuse the built figures.
+# cache_resource hands back the same Figure object instead of unpickling (and
+# re-validating) a copy on every hit; st.plotly_chart only reads the figure.
+@st.cache_resource
+def build_revenue_bar(segments):
+    _, agg = load_data()
+    revenue_by_segment = agg.loc[agg.index.isin(segments), 'monetary_sum'].rename('Monetary').reset_index()
+    fig = px.bar(revenue_by_segment, x='SegmentName', y='Monetary',
+                color='SegmentName',
+                color_discrete_map=colors_map,
+                labels={'Monetary': 'Total Revenue ($)', 'SegmentName': 'Segment'})
+    fig.update_layout(showlegend=False, height=400)
+    return fig
+
+@st.cache_resource
+def build_customer_pie(segments):
+    _, agg = load_data()
+    customer_counts = agg.loc[agg.index.isin(segments), 'count']
+    fig = px.pie(values=customer_counts.values, names=customer_counts.index,
+                color=customer_counts.index,
+                color_discrete_map=colors_map)
+    fig.update_layout(height=400)
+    return fig
 
-rfm = load_data()
+def histogram_bar(values, bins, title, x_label):
+    counts, edges = np.histogram(values, bins=bins)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title='count',
+                      bargap=0, height=300)
+    return fig
 
-# Segment names
-segment_names = {0: 'Lost Customers', 1: 'Core Customers', 2: 'VIP Champions'}
-rfm['SegmentName'] = rfm['Cluster'].map(segment_names)
+@st.cache_resource
+def build_recency_hist(segments):
+    recency = filtered(segments)['Recency'].to_numpy()
+    # Integer-aligned 15-day bins so every bin covers the same number of days
+    bins = np.arange(-0.5, recency.max(initial=0) + 15, 15)
+    return histogram_bar(recency, bins, 'Recency Distribution', 'Days Since Last Purchase')
+
+@st.cache_resource
+def build_frequency_hist(segments):
+    frequency = np.clip(filtered(segments)['Frequency'].to_numpy(), None, 50)
+    # Width-2 bins aligned on the integer counts (1-2, 3-4, ..., 49-50)
+    bins = np.arange(0.5, 52.5, 2)
+    return histogram_bar(frequency, bins, 'Frequency Distribution (capped at 50)', 'Number of Purchases')
+
+@st.cache_resource
+def build_monetary_hist(segments):
+    monetary = np.clip(filtered(segments)['Monetary'].to_numpy(), None, 10000)
+    return histogram_bar(monetary, 50, 'Monetary Distribution (capped at $10k)', 'Total Spending ($)')
+
+@st.cache_resource
+def build_segment_scatter(segment, x, color, title, x_label):
+    # segment is None when the analyzed segment is filtered out in the sidebar
+    if segment is None:
+        segment_sample = filtered(())
+    else:
+        segment_sample = downsample(segment)
+    fig = go.Figure(go.Scattergl(
+        x=segment_sample[x],
+        y=segment_sample['Monetary'],
+        mode='markers',
+        marker=dict(
+            color=segment_sample[color],
+            colorscale='Viridis',
+            size=6,
+            colorbar=dict(title=color)
+        ),
+        customdata=segment_sample[color],
+        hovertemplate=(
+            f'{x_label}=%{{x}}<br>'
+            'Total Spending ($)=%{y}<br>'
+            f'{color}=%{{customdata}}<extra></extra>'
+        )
+    ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title='Total Spending ($)',
+                      height=400)
+    return fig
+
+@st.cache_resource
+def build_3d_scatter(segments):
+    shown = [name for _, name in sorted(segment_names.items()) if name in segments]
+    sample = pd.concat([downsample(name) for name in shown])
+    
+    # One trace for all segments, colored by cluster id; hover reads the axes,
+    # a numeric customdata array (CustomerID, Monetary) and the segment name as text
+    colorscale = [[cluster / (len(segment_names) - 1), colors_map[name]]
+                  for cluster, name in sorted(segment_names.items())]
+    customdata = sample[['CustomerID', 'Monetary']].to_numpy()
+    
+    fig = go.Figure(go.Scatter3d(
+        x=sample['Recency'],
+        y=sample['Frequency'],
+        z=sample['LogMonetary'],
+        mode='markers',
+        showlegend=False,
+        marker=dict(
+            size=4,
+            color=sample['Cluster'].to_numpy(),
+            colorscale=colorscale,
+            cmin=0,
+            cmax=len(segment_names) - 1,
+            showscale=False,
+            opacity=0.7
+        ),
+        customdata=customdata,
+        text=sample['SegmentName'].astype(str),
+        hovertemplate=(
+            'Customer ID: %{customdata[0]:d}<br>'
+            'Recency: %{x} days<br>'
+            'Frequency: %{y} purchases<br>'
+            'Monetary: $%{customdata[1]:,.0f}<br>'
+            'Segment: %{text}<extra></extra>'
+        )
+    ))
+    
+    # Empty traces so the legend still lists each segment's color; the legend is
+    # made static below since these traces hold no points to toggle
+    for segment_name in shown:
+        fig.add_trace(go.Scatter3d(
+            x=[None], y=[None], z=[None],
+            mode='markers',
+            name=segment_name,
+            marker=dict(size=4, color=colors_map[segment_name])
+        ))
+    
+    fig.update_layout(
+        scene=dict(
+            xaxis_title='Recency (days)',
+            yaxis_title='Frequency (purchases)',
+            zaxis_title='Monetary (log scale)',
+            camera=dict(eye=dict(x=1.5, y=1.5, z=1.3))
+        ),
+        height=700,
+        showlegend=True,
+        legend=dict(itemclick=False, itemdoubleclick=False)
+    )
+    return fig
+
+rfm, agg = load_data()
+
+total_customers = int(agg['count'].sum())
+total_revenue = agg['monetary_sum'].sum()
 
 # Sidebar
 st.sidebar.header("📊 Dashboard Controls")
@@ -42,32 +268,41 @@ selected_segments = st.sidebar.multiselect(
     default=list(segment_names.values())
 )
 
-# Filter data
-filtered_rfm = rfm[rfm['SegmentName'].isin(selected_segments)]
-
 st.sidebar.markdown("---")
-st.sidebar.metric("Total Customers", f"{len(rfm):,}")
-st.sidebar.metric("Total Revenue", f"${rfm['Monetary'].sum():,.0f}")
-st.sidebar.metric("Avg Customer Value", f"${rfm['Monetary'].mean():,.0f}")
+st.sidebar.metric("Total Customers", f"{total_customers:,}")
+st.sidebar.metric("Total Revenue", f"${total_revenue:,.0f}")
+st.sidebar.metric("Avg Customer Value", f"${total_revenue / total_customers:,.0f}")
 
-# Main dashboard tabs
-tab1, tab2, tab3, tab4 = st.tabs(["📈 Overview", "🔍 Segment Analysis", "💡 Business Insights", "📊 Interactive 3D"])
+# Nothing to show without a segment, so skip rendering the tabs entirely
+if not selected_segments:
+    st.info("Select at least one segment")
+    st.stop()
+
+# Filter data
+segments_key = tuple(sorted(selected_segments))
+if len(selected_segments) == len(segment_names):
+    filtered_agg = agg
+else:
+    filtered_agg = agg[agg.index.isin(selected_segments)]
+
+# Each tab renders in its own fragment so widgets inside a tab only rerun that tab
 
 # TAB 1: Overview
-with tab1:
+@st.fragment
+def render_tab1(filtered_agg, segments_key):
     st.header("Customer Segmentation Overview")
     
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Customers", f"{len(filtered_rfm):,}")
+        st.metric("Total Customers", f"{int(filtered_agg['count'].sum()):,}")
     with col2:
-        st.metric("Segments", len(filtered_rfm['SegmentName'].unique()))
+        st.metric("Segments", len(filtered_agg))
     with col3:
-        st.metric("Total Revenue", f"${filtered_rfm['Monetary'].sum()/1e6:.2f}M")
+        st.metric("Total Revenue", f"${filtered_agg['monetary_sum'].sum()/1e6:.2f}M")
     with col4:
-        avg_recency = filtered_rfm['Recency'].mean()
+        avg_recency = (filtered_agg['recency_mean'] * filtered_agg['count']).sum() / filtered_agg['count'].sum()
         st.metric("Avg Recency", f"{avg_recency:.0f} days")
     
     st.markdown("---")
@@ -77,22 +312,11 @@ with tab1:
     
     with col1:
         st.subheader("Revenue by Segment")
-        revenue_by_segment = filtered_rfm.groupby('SegmentName')['Monetary'].sum().reset_index()
-        fig = px.bar(revenue_by_segment, x='SegmentName', y='Monetary',
-                    color='SegmentName',
-                    color_discrete_map={'Lost Customers': 'red', 'Core Customers': 'green', 'VIP Champions': 'gold'},
-                    labels={'Monetary': 'Total Revenue ($)', 'SegmentName': 'Segment'})
-        fig.update_layout(showlegend=False, height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_revenue_bar(segments_key), use_container_width=True)
     
     with col2:
         st.subheader("Customer Distribution")
-        customer_counts = filtered_rfm['SegmentName'].value_counts()
-        fig = px.pie(values=customer_counts.values, names=customer_counts.index,
-                    color=customer_counts.index,
-                    color_discrete_map={'Lost Customers': 'red', 'Core Customers': 'green', 'VIP Champions': 'gold'})
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_customer_pie(segments_key), use_container_width=True)
     
     # RFM distributions
     st.markdown("---")
@@ -101,37 +325,29 @@ with tab1:
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        fig = px.histogram(filtered_rfm, x='Recency', nbins=50, 
-                          title='Recency Distribution',
-                          labels={'Recency': 'Days Since Last Purchase'})
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_recency_hist(segments_key), use_container_width=True)
     
     with col2:
-        freq_capped = filtered_rfm['Frequency'].clip(upper=50)
-        fig = px.histogram(freq_capped, x='Frequency', nbins=30,
-                          title='Frequency Distribution (capped at 50)',
-                          labels={'Frequency': 'Number of Purchases'})
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_frequency_hist(segments_key), use_container_width=True)
     
     with col3:
-        monetary_capped = filtered_rfm['Monetary'].clip(upper=10000)
-        fig = px.histogram(monetary_capped, x='Monetary', nbins=50,
-                          title='Monetary Distribution (capped at $10k)',
-                          labels={'Monetary': 'Total Spending ($)'})
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_monetary_hist(segments_key), use_container_width=True)
 
 # TAB 2: Segment Analysis
-with tab2:
+@st.fragment
+def render_tab2(segments_key):
     st.header("Detailed Segment Analysis")
     
     # Segment selector
     selected_segment = st.selectbox("Select a segment to analyze", 
                                     options=list(segment_names.values()))
     
-    segment_data = filtered_rfm[filtered_rfm['SegmentName'] == selected_segment]
+    if selected_segment in segments_key:
+        segment_data = get_segment(selected_segment)
+        analyzed_segment = selected_segment
+    else:
+        segment_data = rfm.iloc[:0]
+        analyzed_segment = None
     
     # Segment KPIs
     col1, col2, col3, col4 = st.columns(4)
@@ -152,13 +368,17 @@ with tab2:
     
     with col1:
         st.subheader("RFM Statistics")
-        stats = segment_data[['Recency', 'Frequency', 'Monetary']].describe()
-        st.dataframe(stats.style.format("{:.2f}"))
+        stats = segment_data[['Recency', 'Frequency', 'Monetary']].describe().round(2)
+        st.dataframe(stats)
     
     with col2:
         st.subheader("Top 10 Customers in Segment")
-        top_customers = segment_data.nlargest(10, 'Monetary')[['CustomerID', 'Recency', 'Frequency', 'Monetary']]
-        st.dataframe(top_customers.style.format({'Monetary': '${:,.0f}'}))
+        if analyzed_segment is None:
+            top_customers = segment_data[['CustomerID', 'Recency', 'Frequency', 'Monetary']]
+        else:
+            top_customers = get_top_customers(analyzed_segment)
+        # Only k rows, already sorted by spend: format Monetary here and show a static table
+        st.table(top_customers.assign(Monetary=top_customers['Monetary'].map('${:,.0f}'.format)))
     
     st.markdown("---")
     
@@ -166,72 +386,47 @@ with tab2:
     col1, col2 = st.columns(2)
     
     with col1:
-        fig = px.scatter(segment_data, x='Recency', y='Monetary',
-                        color='Frequency', size='Monetary',
-                        title='Recency vs Monetary',
-                        labels={'Recency': 'Days Since Last Purchase', 'Monetary': 'Total Spending ($)'})
-        fig.update_layout(height=400)
+        fig = build_segment_scatter(analyzed_segment, 'Recency', 'Frequency',
+                                    'Recency vs Monetary', 'Days Since Last Purchase')
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        fig = px.scatter(segment_data, x='Frequency', y='Monetary',
-                        color='Recency', size='Monetary',
-                        title='Frequency vs Monetary',
-                        labels={'Frequency': 'Number of Purchases', 'Monetary': 'Total Spending ($)'})
-        fig.update_layout(height=400)
+        fig = build_segment_scatter(analyzed_segment, 'Frequency', 'Recency',
+                                    'Frequency vs Monetary', 'Number of Purchases')
         st.plotly_chart(fig, use_container_width=True)
 
 # TAB 3: Business Insights
-with tab3:
+@st.fragment
+def render_tab3(agg):
     st.header("💡 Business Insights & Recommendations")
     
-    # Calculate key metrics
-    total_revenue = rfm['Monetary'].sum()
-    
     st.markdown("### 📊 Key Findings")
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
         st.markdown("#### 🔴 Lost Customers")
-        lost = rfm[rfm['SegmentName'] == 'Lost Customers']
-        st.write(f"**{len(lost):,} customers** (38.8%)")
-        st.write(f"**${lost['Monetary'].sum()/1e6:.1f}M revenue** (7%)")
-        st.write(f"**Avg recency:** {lost['Recency'].mean():.0f} days")
-        st.markdown("""
-        **Strategy:**
-        - Win-back email campaign with 20% discount
-        - Survey to understand why they left
-        - Low priority - already churned
-        """)
+        lost = agg.loc['Lost Customers']
+        st.write(f"**{int(lost['count']):,} customers** (38.8%)")
+        st.write(f"**${lost['monetary_sum']/1e6:.1f}M revenue** (7%)")
+        st.write(f"**Avg recency:** {lost['recency_mean']:.0f} days")
+        st.markdown(segment_strategies['Lost Customers'])
     
     with col2:
         st.markdown("#### 🟢 Core Customers")
-        core = rfm[rfm['SegmentName'] == 'Core Customers']
-        st.write(f"**{len(core):,} customers** (60.8%)")
-        st.write(f"**${core['Monetary'].sum()/1e6:.1f}M revenue** (75%)")
-        st.write(f"**Avg frequency:** {core['Frequency'].mean():.1f} purchases")
-        st.markdown("""
-        **Strategy:**
-        - Loyalty program to increase frequency
-        - Personalized product recommendations
-        - Early access to sales
-        - **PROTECT THIS SEGMENT!**
-        """)
+        core = agg.loc['Core Customers']
+        st.write(f"**{int(core['count']):,} customers** (60.8%)")
+        st.write(f"**${core['monetary_sum']/1e6:.1f}M revenue** (75%)")
+        st.write(f"**Avg frequency:** {core['frequency_mean']:.1f} purchases")
+        st.markdown(segment_strategies['Core Customers'])
     
     with col3:
         st.markdown("#### 💎 VIP Champions")
-        vip = rfm[rfm['SegmentName'] == 'VIP Champions']
-        st.write(f"**{len(vip):,} customers** (0.4%)")
-        st.write(f"**${vip['Monetary'].sum()/1e6:.1f}M revenue** (18%)")
-        st.write(f"**Avg spend:** ${vip['Monetary'].mean():,.0f}")
-        st.markdown("""
-        **Strategy:**
-        - VIP account manager
-        - Exclusive previews & private sales
-        - Premium support
-        - **Call if inactive >30 days!**
-        """)
+        vip = agg.loc['VIP Champions']
+        st.write(f"**{int(vip['count']):,} customers** (0.4%)")
+        st.write(f"**${vip['monetary_sum']/1e6:.1f}M revenue** (18%)")
+        st.write(f"**Avg spend:** ${vip['monetary_mean']:,.0f}")
+        st.markdown(segment_strategies['VIP Champions'])
     
     st.markdown("---")
     
@@ -262,27 +457,11 @@ with tab3:
     # Revenue comparison
     st.markdown("### 📈 Segment Comparison")
     
-    comparison = rfm.groupby('SegmentName').agg({
-        'CustomerID': 'count',
-        'Recency': 'mean',
-        'Frequency': 'mean',
-        'Monetary': ['mean', 'sum']
-    }).round(2)
-    
-    comparison.columns = ['Customer Count', 'Avg Recency (days)', 'Avg Frequency', 'Avg Monetary ($)', 'Total Revenue ($)']
-    comparison['Revenue %'] = (comparison['Total Revenue ($)'] / comparison['Total Revenue ($)'].sum() * 100).round(1)
-    
-    st.dataframe(comparison.style.format({
-        'Customer Count': '{:,.0f}',
-        'Avg Recency (days)': '{:.0f}',
-        'Avg Frequency': '{:.1f}',
-        'Avg Monetary ($)': '${:,.0f}',
-        'Total Revenue ($)': '${:,.0f}',
-        'Revenue %': '{:.1f}%'
-    }))
+    st.table(build_comparison_table())
 
 # TAB 4: Interactive 3D
-with tab4:
+@st.fragment
+def render_tab4(segments_key):
     st.header("Interactive 3D Customer Segmentation")
     
     st.markdown("""
@@ -293,55 +472,22 @@ with tab4:
     """)
     
     # Create 3D plot
-    colors_map = {'Lost Customers': 'red', 'Core Customers': 'green', 'VIP Champions': 'gold'}
-    
-    fig = go.Figure()
-    
-    for segment_name in filtered_rfm['SegmentName'].unique():
-        segment_data = filtered_rfm[filtered_rfm['SegmentName'] == segment_name]
-        
-        hover_text = [
-            f"Customer ID: {cid}<br>" +
-            f"Recency: {r} days<br>" +
-            f"Frequency: {f} purchases<br>" +
-            f"Monetary: ${m:,.0f}<br>" +
-            f"Segment: {segment_name}"
-            for cid, r, f, m in zip(
-                segment_data['CustomerID'],
-                segment_data['Recency'],
-                segment_data['Frequency'],
-                segment_data['Monetary']
-            )
-        ]
-        
-        fig.add_trace(go.Scatter3d(
-            x=segment_data['Recency'],
-            y=segment_data['Frequency'],
-            z=np.log1p(segment_data['Monetary']),
-            mode='markers',
-            name=segment_name,
-            marker=dict(
-                size=4,
-                color=colors_map[segment_name],
-                opacity=0.7,
-                line=dict(width=0.5, color='white')
-            ),
-            text=hover_text,
-            hovertemplate='%{text}<extra></extra>'
-        ))
-    
-    fig.update_layout(
-        scene=dict(
-            xaxis_title='Recency (days)',
-            yaxis_title='Frequency (purchases)',
-            zaxis_title='Monetary (log scale)',
-            camera=dict(eye=dict(x=1.5, y=1.5, z=1.3))
-        ),
-        height=700,
-        showlegend=True
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(build_3d_scatter(segments_key), use_container_width=True)
+
+# Main dashboard tabs
+tab1, tab2, tab3, tab4 = st.tabs(["📈 Overview", "🔍 Segment Analysis", "💡 Business Insights", "📊 Interactive 3D"])
+
+with tab1:
+    render_tab1(filtered_agg, segments_key)
+
+with tab2:
+    render_tab2(segments_key)
+
+with tab3:
+    render_tab3(agg)
+
+with tab4:
+    render_tab4(segments_key)
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,30 @@
+# Static segment definitions for the dashboard. Kept in an imported module so
+# Streamlit reruns reuse them instead of rebuilding them on every interaction.
+
+# Segment names, indexed by K-means cluster id
+segment_names = {0: 'Lost Customers', 1: 'Core Customers', 2: 'VIP Champions'}
+colors_map = {'Lost Customers': 'red', 'Core Customers': 'green', 'VIP Champions': 'gold'}
+
+# Recommended strategy per segment (Business Insights tab)
+segment_strategies = {
+    'Lost Customers': """
+        **Strategy:**
+        - Win-back email campaign with 20% discount
+        - Survey to understand why they left
+        - Low priority - already churned
+        """,
+    'Core Customers': """
+        **Strategy:**
+        - Loyalty program to increase frequency
+        - Personalized product recommendations
+        - Early access to sales
+        - **PROTECT THIS SEGMENT!**
+        """,
+    'VIP Champions': """
+        **Strategy:**
+        - VIP account manager
+        - Exclusive previews & private sales
+        - Premium support
+        - **Call if inactive >30 days!**
+        """,
+}